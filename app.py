@@ -0,0 +1,108 @@
+import chainlit as cl
+from report_generator import ReportGenerator
+
+
+async def send_progress(message: str) -> None:
+    """将生成器的进度信息转发到聊天界面"""
+    await cl.Message(content=message).send()
+
+
+@cl.on_chat_start
+async def start():
+    model_config = {
+        "temperature": 0.7,
+        # 其他配置参数...
+    }
+    
+    generator = ReportGenerator(
+        llm_backend="openai",  # 或 "ollama"
+        model_config=model_config,
+        progress_callback=send_progress
+    )
+    cl.user_session.set("generator", generator)
+    
+    # 发送欢迎消息
+    await cl.Message(
+        content="你好！我是AI写作助手。请按以下格式输入报告需求：\n"
+                "主题：你的报告主题\n"
+                "字数：期望的总字数\n"
+                "#例如：#\n"
+                "主题：张家界实景三维大屏展示系统项目建设方案\n"
+                "字数：30000\n"
+                
+                ).send()
+
+@cl.on_message
+async def main(message: cl.Message):
+    generator = cl.user_session.get("generator")
+    print(f"[DEBUG] Received message: {message.content}")
+    
+    if not generator.title:
+        try:
+            lines = message.content.split('\n')
+            for line in lines:
+                if line.startswith('主题：'):
+                    generator.title = line.replace('主题：', '').strip()
+                elif line.startswith('概述：'):
+                    generator.overview = line.replace('概述：', '').strip()
+                elif line.startswith('字数：'):
+                    generator.total_words = int(line.replace('字数：', '').strip())
+            
+            # Generate summary
+            await cl.Message(content="正在生成摘要...").send()
+            
+            await generator.generate_summary()
+            
+            # Generate outline
+            await cl.Message(content="正在生成大纲...").send()
+            
+            generator.outline_root = await generator.generate_outline()
+            outline_result = "\n".join(
+                node.to_text(include_words=True) for node in generator.outline_root.children
+            )
+
+            await cl.Message(
+                content=f"已生成摘要和大纲：\n\n"
+                        f"摘要：\n{generator.summary}\n\n"
+                        f"大纲：\n{outline_result}\n\n"
+                        f"请输入：\n"
+                        f"1. '继续生成' - 开始生成正文\n"
+                        f"2. '重新生成' - 重新生成大纲").send()
+            
+        except Exception as e:
+            print(f"[ERROR] Error processing input: {str(e)}")
+            await cl.Message(content=f"输入格式有误，请重新输入。错误信息：{str(e)}").send()
+            
+    elif message.content in ["继续生成", "重新生成"]:
+        if message.content == "继续生成":
+            try:
+                # 使用深度优先遍历生成所有内容，未通过质量校验的部分会自动重试
+                await generator.generate_all_content()
+                
+                # 导出文档：Markdown/HTML 立即可预览，Word 文档在后台构建
+                ready, pending = await generator.export_report()
+                elements = [
+                    cl.File(
+                        name=filename,  # 使用生成的文件名
+                        path=filepath,  # 文件的本地路径
+                        display="inline",
+                    )
+                    for filepath, filename in ready.values()
+                ]
+                
+                await cl.Message(
+                    content="报告生成完成！已导出到文件：", elements=elements
+                ).send()
+
+                for task in pending.values():
+                    filepath, filename = await task
+                    await cl.Message(
+                        content="Word 文档已生成：",
+                        elements=[cl.File(name=filename, path=filepath, display="inline")]
+                    ).send()
+                
+                # 下载文件到 本地
+                
+            except Exception as e:
+                print(f"[ERROR] Failed to generate content: {str(e)}")
+                await cl.Message(content=f"生成内容时发生错误：{str(e)}").send()
@@ -1,13 +1,20 @@
 import os
-from dotenv import load_dotenv
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, TYPE_CHECKING
 from abc import ABC, abstractmethod
-from langchain_openai import ChatOpenAI
-from langchain.llms.ollama import Ollama
-from langchain_core.language_models.base import BaseLanguageModel
 
-# Load environment variables from .env file
-load_dotenv()
+if TYPE_CHECKING:
+    from langchain_core.language_models.base import BaseLanguageModel
+
+_env_loaded = False
+
+
+def _load_env() -> None:
+    """首次创建LLM时再读取 .env 文件，避免导入时的开销"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
 
 class BaseLLMWrapper(ABC):
     @abstractmethod
@@ -16,12 +23,14 @@ class BaseLLMWrapper(ABC):
         pass
     
     @abstractmethod
-    def get_model(self) -> BaseLanguageModel:
+    def get_model(self) -> "BaseLanguageModel":
         """获取底层LLM模型的抽象方法"""
         pass
 
 class OpenAIWrapper(BaseLLMWrapper):
     def __init__(self, model_name: str = None, **kwargs):
+        from langchain_openai import ChatOpenAI
+
         # Parse the OAI_CONFIG_LIST from environment variables
         config_str = os.getenv("OAI_CONFIG_LIST")
         if config_str is None:
@@ -44,11 +53,13 @@ class OpenAIWrapper(BaseLLMWrapper):
     async def generate(self, prompt: str) -> str:
         return await self.llm.ainvoke(prompt)
     
-    def get_model(self) -> BaseLanguageModel:
+    def get_model(self) -> "BaseLanguageModel":
         return self.llm
 
 class OllamaWrapper(BaseLLMWrapper):
     def __init__(self, model_name: str = "llama2", **kwargs):
+        from langchain.llms.ollama import Ollama
+
         self.llm = Ollama(
             model=model_name,
             **kwargs
@@ -57,7 +68,7 @@ class OllamaWrapper(BaseLLMWrapper):
     async def generate(self, prompt: str) -> str:
         return await self.llm.ainvoke(prompt)
     
-    def get_model(self) -> BaseLanguageModel:
+    def get_model(self) -> "BaseLanguageModel":
         return self.llm
 
 def create_llm(
@@ -76,6 +87,7 @@ def create_llm(
     """
     if model_config is None:
         model_config = {}
+    _load_env()
     
     if backend == "openai":
         return OpenAIWrapper(**model_config)
@@ -0,0 +1,92 @@
+import os
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from langchain.prompts import PromptTemplate
+
+# 内置模板目录，文件命名为 <名称>.<版本>.txt，例如 outline.v1.txt
+PROMPT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+# 通过该环境变量指定覆盖目录，其中的同名文件优先于内置模板
+PROMPT_OVERRIDE_ENV = "LAPIS_PROMPT_DIR"
+
+# 各模板当前使用的版本，修改提示词时新增版本文件并在此处切换
+TEMPLATE_VERSIONS: Dict[str, str] = {
+    "summary": "v1",
+    "outline": "v1",
+    "outline_json": "v1",
+    "subsection_outline": "v1",
+    "single_part": "v2",
+    "content_summary": "v1",
+}
+
+
+class PromptRegistry:
+    """提示模板注册表，每个模板版本只读取和编译一次
+
+    模板文本在创建注册表时读入；编译为 PromptTemplate 推迟到首次 get，
+    以免导入本模块时加载 langchain。
+    """
+
+    def __init__(self, versions: Dict[str, str], search_dirs: List[str]):
+        self.versions = dict(versions)
+        self.search_dirs = list(search_dirs)
+        self._texts: Dict[str, str] = {}
+        self._templates: Dict[str, "PromptTemplate"] = {}
+        # 预先读取当前版本的全部模板文本
+        for name, version in self.versions.items():
+            self.text(name, version)
+
+    @staticmethod
+    def key(name: str, version: str) -> str:
+        """模板缓存键，形如 outline@v1"""
+        return f"{name}@{version}"
+
+    def _find_file(self, name: str, version: str) -> str:
+        filename = f"{name}.{version}.txt"
+        for directory in self.search_dirs:
+            path = os.path.join(directory, filename)
+            if os.path.isfile(path):
+                return path
+        raise FileNotFoundError(f"Prompt template not found: {filename}")
+
+    def _resolve_version(self, name: str, version: Optional[str]) -> str:
+        if version is not None:
+            return version
+        if name not in self.versions:
+            raise KeyError(f"Unknown prompt template: {name}")
+        return self.versions[name]
+
+    def text(self, name: str, version: Optional[str] = None) -> str:
+        """获取模板原文，未指定版本时使用当前版本"""
+        version = self._resolve_version(name, version)
+        key = self.key(name, version)
+        if key not in self._texts:
+            with open(self._find_file(name, version), encoding="utf-8") as f:
+                self._texts[key] = f.read()
+        return self._texts[key]
+
+    def get(self, name: str, version: Optional[str] = None) -> "PromptTemplate":
+        """获取编译好的模板，未指定版本时使用当前版本"""
+        from langchain.prompts import PromptTemplate
+
+        version = self._resolve_version(name, version)
+        key = self.key(name, version)
+        if key not in self._templates:
+            self._templates[key] = PromptTemplate.from_template(self.text(name, version))
+        return self._templates[key]
+
+    def names(self) -> List[str]:
+        return list(self.versions)
+
+
+def _search_dirs() -> List[str]:
+    dirs = []
+    override_dir = os.getenv(PROMPT_OVERRIDE_ENV)
+    if override_dir:
+        dirs.append(override_dir)
+    dirs.append(PROMPT_DIR)
+    return dirs
+
+
+# 模块导入时读取一次，供所有 ReportGenerator 共享
+PROMPTS = PromptRegistry(TEMPLATE_VERSIONS, _search_dirs())
@@ -0,0 +1,119 @@
+import re
+from typing import Dict, Iterable, List, Set
+
+# 实际字数与目标字数的允许比例范围
+MIN_LENGTH_RATIO = 0.5
+MAX_LENGTH_RATIO = 2.0
+# 与兄弟部分重复的 n-gram 占比超过该阈值视为重复内容
+DUPLICATE_THRESHOLD = 0.3
+NGRAM_SIZE = 10
+# 末尾未以句末标点结束且最后一行超过该长度时视为被截断
+TRUNCATION_MIN_LINE = 20
+
+# 各类问题在重试提示中对应的修改要求，按问题描述的前缀匹配
+RETRY_GUIDANCE = {
+    "内容为空": "请完整输出本部分正文。",
+    "内容被截断": "请完整写完每一句话，以完整的句子结束。",
+    "输出了大纲而非正文": "请直接输出连贯的正文段落，不要输出大纲。",
+    "混入": "正文中不要出现编号标题或“(N字)”形式的字数标注。",
+    "字数偏差过大": "请严格控制篇幅，使字数接近目标字数。",
+}
+
+SENTENCE_ENDINGS = "。！？!?.…；;”」』）)\"'"
+
+# 形如 "1.1 标题 (1000字)" 的大纲行
+OUTLINE_LINE_PATTERN = re.compile(r'^[-*\s]*\d+(\.\d+)*[\.、]?\s*.+?[\(（]\s*\d+\s*字\s*[\)）]\s*$')
+
+
+def count_words(text: str) -> int:
+    """统计字数：中文按字符计，英文按单词计"""
+    chinese = len(re.findall(r'[\u4e00-\u9fff]', text))
+    latin = len(re.findall(r'[A-Za-z]+', text))
+    return chinese + latin
+
+
+def clean_section_content(content: str) -> str:
+    """去掉模型输出中混入的 Markdown 标题行（# 开头），这类问题无需重新生成"""
+    lines = [line for line in content.splitlines() if not line.strip().startswith('#')]
+    return "\n".join(lines).strip()
+
+
+def _ngrams(text: str, n: int = NGRAM_SIZE) -> Set[str]:
+    compact = re.sub(r'\s+', '', text)
+    return {compact[i:i + n] for i in range(len(compact) - n + 1)}
+
+
+def duplication_ratio(content: str, other: str, n: int = NGRAM_SIZE) -> float:
+    """content 中与 other 重复的 n-gram 占比"""
+    grams = _ngrams(content, n)
+    if not grams:
+        return 0.0
+    return len(grams & _ngrams(other, n)) / len(grams)
+
+
+def is_truncated(content: str) -> bool:
+    """判断内容是否在句中被截断"""
+    lines = [line.strip() for line in content.splitlines() if line.strip()]
+    if not lines:
+        return True
+    last_line = lines[-1]
+    return last_line[-1] not in SENTENCE_ENDINGS and len(last_line) > TRUNCATION_MIN_LINE
+
+
+def check_section(content: str, target_words: int, siblings: Iterable[str] = ()) -> List[str]:
+    """校验单个部分的生成结果，返回发现的问题列表，空列表表示通过
+
+    Args:
+        content: 已清理的部分内容
+        target_words: 大纲中该部分的预期字数
+        siblings: 兄弟部分已生成的内容，用于检测重复
+    """
+    if not content.strip():
+        return ["内容为空"]
+
+    issues = []
+    if is_truncated(content):
+        issues.append("内容被截断")
+
+    lines = [line for line in content.splitlines() if line.strip()]
+    outline_lines = sum(1 for line in lines if OUTLINE_LINE_PATTERN.match(line))
+    if outline_lines * 2 >= len(lines):
+        issues.append("输出了大纲而非正文")
+    elif outline_lines:
+        issues.append(f"混入{outline_lines}行大纲标记")
+
+    if target_words > 0:
+        ratio = count_words(content) / target_words
+        if ratio < MIN_LENGTH_RATIO or ratio > MAX_LENGTH_RATIO:
+            issues.append(f"字数偏差过大（实际{count_words(content)}字，目标{target_words}字）")
+
+    for sibling in siblings:
+        if sibling and duplication_ratio(content, sibling) > DUPLICATE_THRESHOLD:
+            issues.append("与相邻部分内容重复")
+            break
+
+    return issues
+
+
+def duplicated_siblings(content: str, siblings: Dict[str, str]) -> List[str]:
+    """返回与 content 重复度超过阈值的兄弟部分标题，siblings 为 {标题: 内容}"""
+    return [
+        title for title, other in siblings.items()
+        if other and duplication_ratio(content, other) > DUPLICATE_THRESHOLD
+    ]
+
+
+def build_retry_hint(issues: List[str], duplicate_titles: Iterable[str] = ()) -> str:
+    """根据校验问题生成重试提示，告诉模型上一次输出需要修正的地方"""
+    if not issues:
+        return ""
+    lines = ["上一次生成的内容未通过质量检查，请针对以下问题重新撰写："]
+    for issue in issues:
+        guidance = next(
+            (text for prefix, text in RETRY_GUIDANCE.items() if issue.startswith(prefix)), ""
+        )
+        if issue == "与相邻部分内容重复":
+            titles = "、".join(f"“{title}”" for title in duplicate_titles)
+            guidance = f"请避免与{titles or '相邻部分'}重复，从不同角度展开，补充新的内容。"
+        lines.append(f"- {issue}。{guidance}")
+    return "\n".join(lines)
@@ -0,0 +1,174 @@
+import html
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+def content_lines(content: str) -> List[str]:
+    """拆分正文为段落，与 DocFormatter.add_content 一致地跳过空行和 ## 开头的行"""
+    return [
+        line for line in content.splitlines()
+        if line.strip() and not line.strip().startswith('##')
+    ]
+
+
+class BaseRenderer(ABC):
+    """报告渲染器：按遍历顺序接收标题和正文事件，写出一种文件格式"""
+
+    extension = ""
+    # 为 True 时 close() 开销较大，调用方应放到后台执行
+    deferred = False
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+
+    @abstractmethod
+    def start(self, title: str) -> None:
+        """开始文档并写入报告标题"""
+
+    @abstractmethod
+    def heading(self, text: str, level: int) -> None:
+        """写入标题，level 从 1 开始，不限深度"""
+
+    @abstractmethod
+    def content(self, text: str) -> None:
+        """写入正文"""
+
+    @abstractmethod
+    def close(self) -> str:
+        """结束文档并返回文件路径"""
+
+    def discard(self) -> None:
+        """渲染中途失败时调用，释放资源并删除未写完的文件"""
+
+
+class StreamingRenderer(BaseRenderer):
+    """边遍历边写入文件的渲染器，文件在 start() 中打开"""
+
+    _file = None
+
+    def _open(self) -> None:
+        self._file = open(self.filepath, "w", encoding="utf-8")
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self.filepath)
+
+
+class MarkdownRenderer(StreamingRenderer):
+    extension = "md"
+
+    def start(self, title: str) -> None:
+        self._open()
+        self._file.write(f"# {title}\n\n")
+
+    def heading(self, text: str, level: int) -> None:
+        # 报告标题占用一级，Markdown 最多六级
+        self._file.write(f"{'#' * min(level + 1, 6)} {text}\n\n")
+
+    def content(self, text: str) -> None:
+        for line in content_lines(text):
+            self._file.write(f"{line.strip()}\n\n")
+
+    def close(self) -> str:
+        self._file.close()
+        self._file = None
+        return self.filepath
+
+
+class HtmlRenderer(StreamingRenderer):
+    extension = "html"
+
+    def start(self, title: str) -> None:
+        self._open()
+        escaped = html.escape(title)
+        self._file.write(
+            "<!DOCTYPE html>\n<html lang=\"zh-CN\">\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{escaped}</title>\n</head>\n<body>\n<h1>{escaped}</h1>\n"
+        )
+
+    def heading(self, text: str, level: int) -> None:
+        tag = f"h{min(level + 1, 6)}"
+        self._file.write(f"<{tag}>{html.escape(text)}</{tag}>\n")
+
+    def content(self, text: str) -> None:
+        for line in content_lines(text):
+            self._file.write(f"<p>{html.escape(line.strip())}</p>\n")
+
+    def close(self) -> str:
+        self._file.write("</body>\n</html>\n")
+        self._file.close()
+        self._file = None
+        return self.filepath
+
+
+class DocxRenderer(BaseRenderer):
+    """Word 渲染器：遍历时只记录操作，close() 时再加载 python-docx 构建并保存"""
+
+    extension = "docx"
+    deferred = True
+
+    def start(self, title: str) -> None:
+        self._ops: List[Tuple[str, str]] = [("add_title", title)]
+
+    def heading(self, text: str, level: int) -> None:
+        # 三级及更深的标题统一使用小节样式，避免深层子大纲丢失标题
+        method = {1: "add_chapter", 2: "add_section"}.get(level, "add_subsection")
+        self._ops.append((method, text))
+
+    def content(self, text: str) -> None:
+        self._ops.append(("add_content", text))
+
+    def close(self) -> str:
+        from doc_formatter import DocFormatter
+
+        formatter = DocFormatter()
+        for method, arg in self._ops:
+            getattr(formatter, method)(arg)
+        formatter.save(self.filepath)
+        return self.filepath
+
+
+RENDERERS: Dict[str, type] = {
+    renderer.extension: renderer
+    for renderer in (MarkdownRenderer, HtmlRenderer, DocxRenderer)
+}
+
+
+def create_renderers(formats: Iterable[str], output_dir: str, stem: str) -> Dict[str, BaseRenderer]:
+    """按格式创建渲染器，文件统一写入 output_dir/<stem>.<扩展名>"""
+    os.makedirs(output_dir, exist_ok=True)
+    renderers = {}
+    for fmt in formats:
+        if fmt not in RENDERERS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        renderers[fmt] = RENDERERS[fmt](os.path.join(output_dir, f"{stem}.{fmt}"))
+    return renderers
+
+
+def render_report(title: str, summary: str, root: Any, renderers: Iterable[BaseRenderer]) -> None:
+    """单次遍历大纲树，把每个事件同时分发给所有渲染器
+
+    root 需提供 iter_nodes()，按先序依次返回各节点（不含根节点）。
+    遍历中途出错时所有渲染器都会被 discard()，不会留下未关闭的文件。
+    """
+    renderers = list(renderers)
+    try:
+        for renderer in renderers:
+            renderer.start(title)
+            renderer.heading("摘要", 1)
+            renderer.content(summary)
+
+        for node in root.iter_nodes():
+            if node.number and node.title:
+                for renderer in renderers:
+                    renderer.heading(f"{node.number} {node.title}", node.level)
+            if node.is_leaf() and node.content:
+                for renderer in renderers:
+                    renderer.content(node.content)
+    except BaseException:
+        for renderer in renderers:
+            renderer.discard()
+        raise
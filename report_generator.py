@@ -1,55 +1,19 @@
-from typing import Dict, List, Optional, Any
-import chainlit as cl
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Iterator, Tuple
+import asyncio
 import re
+import json
 from llm_wrapper import create_llm, BaseLLMWrapper
-from doc_formatter import DocFormatter
+from prompt_templates import PROMPTS
+from quality_gate import build_retry_hint, check_section, clean_section_content, duplicated_siblings
+from renderers import BaseRenderer, create_renderers, render_report
 import os
 from datetime import datetime
 
 PART_LENGTH = 1000
-# 定义提示模板
-OUTLINE_TEMPLATE = """
-基于以下主题和摘要生成一个详细的报告大纲，并为每个部分标注预期字数。
-总字数要求：{total_words}字
-
-主题：{title}
-摘要：{summary}
-
-请按以下格式输出：
-1. 第一部分标题 (预期字数)
-    1.1 子部分标题 (预期字数)
-    1.2 子部分标题 (预期字数)
-    ...
-2. 第二部分标题 (预期字数)
-    2.1 子部分标题 (预期字数)
-    2.2 子部分标题 (预期字数)
-    ...
-...
-
-注意：所有部分的字数总和应该接近要求的总字数。
-"""
-
-# Add new template for summary
-SUMMARY_TEMPLATE = """
-请基于以下主题生成一段简洁的摘要，概括报告的主要内容和目的：
-
-主题：{title}
-
-要求：
-1. 控制在200字以内
-2. 清晰概括主要内容
-3. 突出报告价值和意义
-"""
-
-CONTENT_SUMMARY_TEMPLATE = """
-请对以下内容进行概括总结，用100字左右简要说明主要内容：
-
-{content}
-
-请生成概要：
-"""
+MAX_RETRIES = 2
+OUTPUT_DIR = "output"
+# 默认导出格式，docx 在后台构建
+EXPORT_FORMATS = ["md", "html", "docx"]
 # 添加新的数据结构来表示大纲节点
 class OutlineNode:
     def __init__(self, title: str, words: int, number: Optional[str] = None):
@@ -65,6 +29,14 @@ class OutlineNode:
     
     def is_leaf(self) -> bool:
         return len(self.children) == 0
+
+    def iter_nodes(self) -> Iterator['OutlineNode']:
+        """先序遍历所有后代节点（不含自身），使用显式栈避免递归"""
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
     
     def __repr__(self) -> str:
         return f"OutlineNode(title='{self.title}', words={self.words}, number='{self.number}', level={self.level})"
@@ -109,8 +81,8 @@ def parse_outline(outline_text: str, root_title: str = "报告正文") -> Outlin
         if not line:
             continue
 
-        # 使用正则表达式匹配编号、标题和字数
-        match = re.search(r'(\d+[\.\d+]*)\s*(.+?)\s*\((\d+)字\)', line)
+        # 使用正则表达式匹配编号、标题和字数（兼容全角括号）
+        match = re.search(r'(\d+[\.\d+]*)\s*(.+?)\s*[\(（]\s*(\d+)\s*字\s*[\)）]', line)
         if match:
             number, title, words = match.groups()
             number = number.strip(".")
@@ -141,27 +113,231 @@ def parse_outline(outline_text: str, root_title: str = "报告正文") -> Outlin
     print(f"[DEBUG] Parsed outline tree: {root}")
     return root
 
+
+def attach_subsections(node: OutlineNode, children: List[OutlineNode]) -> None:
+    """把子大纲节点挂到 node 下，编号和层级按 node 重新计算（如 2.1 下的子部分为 2.1.1）"""
+    node.children = []
+    for index, child in enumerate(children, start=1):
+        child.number = f"{node.number}.{index}" if node.number else str(index)
+        child.level = node.level + 1
+        node.add_child(child)
+        attach_subsections(child, list(child.children))
+
+
+def _parse_words(value: Any) -> int:
+    """解析字数字段，兼容 3000、"3000"、"3000字" 等形式"""
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        return max(int(value), 0)
+    match = re.search(r'\d+', str(value or ""))
+    return int(match.group()) if match else 0
+
+
+def outline_from_dict(data: Any, root_title: str = "报告正文") -> Optional[OutlineNode]:
+    """将结构化大纲（{"sections": [...]} 或节点列表）转换为树形结构
+
+    编号缺失或与层级不符时按位置重新编号；没有有效节点时返回 None。
+    """
+    sections = data.get("sections") if isinstance(data, dict) else data
+    if not isinstance(sections, list):
+        return None
+
+    def build(items: List[Any], parent: OutlineNode, prefix: str, level: int) -> None:
+        index = 0
+        for item in items:
+            if not isinstance(item, dict) or not str(item.get("title") or "").strip():
+                continue
+            index += 1
+            expected = f"{prefix}.{index}" if prefix else str(index)
+            number = str(item.get("number") or "").strip().strip(".")
+            if not re.fullmatch(r'\d+(\.\d+)*', number) or len(number.split(".")) != level:
+                number = expected
+            node = OutlineNode(
+                title=str(item["title"]).strip(),
+                words=_parse_words(item.get("words")),
+                number=number
+            )
+            node.level = level
+            parent.add_child(node)
+            children = item.get("children")
+            if isinstance(children, list):
+                build(children, node, number, level + 1)
+
+    root = OutlineNode(root_title, 0)
+    build(sections, root, "", 1)
+    return root if root.children else None
+
+
+def parse_outline_json(outline_text: str, root_title: str = "报告正文") -> Optional[OutlineNode]:
+    """解析模型返回的 JSON 大纲文本，允许包裹在 ```json 代码块中；解析失败时返回 None"""
+    text = outline_text.strip()
+    fenced = re.search(r'```(?:json)?\s*(.*?)```', text, re.S)
+    if fenced:
+        text = fenced.group(1).strip()
+    # 从每个 { 或 [ 处尝试解码，忽略 JSON 前后的说明文字（其中可能也含括号）
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r'[\{\[]', text):
+        try:
+            data, _ = decoder.raw_decode(text, match.start())
+        except ValueError:
+            continue
+        root = outline_from_dict(data, root_title)
+        if root is not None:
+            return root
+    print("[DEBUG] Failed to parse outline JSON")
+    return None
+
+
+def normalize_outline_words(root: OutlineNode, total_words: int, tolerance: float = 0.1) -> OutlineNode:
+    """校验并修正大纲字数预算
+
+    自顶向下检查每个节点：缺失字数的子节点平分剩余预算；子节点字数之和与
+    父节点（根节点为 total_words）偏差超过 tolerance 时按比例缩放。
+    """
+    if total_words > 0:
+        root.words = total_words
+
+    def fix(node: OutlineNode) -> None:
+        if not node.children or node.words <= 0:
+            for child in node.children:
+                fix(child)
+            return
+
+        target = node.words
+        missing = [child for child in node.children if child.words <= 0]
+        if missing:
+            known = sum(child.words for child in node.children if child.words > 0)
+            share = max(target - known, 0) // len(missing) or target // len(node.children)
+            for child in missing:
+                child.words = share
+
+        actual = sum(child.words for child in node.children)
+        if actual > 0 and abs(actual - target) > target * tolerance:
+            print(f"[DEBUG] Rescaling '{node.title}' children from {actual} to {target} words")
+            for child in node.children:
+                child.words = max(round(child.words * target / actual), 1)
+
+        for child in node.children:
+            fix(child)
+
+    fix(root)
+    return root
+
+
+# 结构化输出使用的大纲 JSON Schema
+OUTLINE_SCHEMA: Dict[str, Any] = {
+    "title": "ReportOutline",
+    "description": "报告大纲，每个部分包含编号、标题、预期字数和子部分",
+    "type": "object",
+    "properties": {
+        "sections": {"type": "array", "items": {"$ref": "#/$defs/section"}}
+    },
+    "required": ["sections"],
+    "$defs": {
+        "section": {
+            "type": "object",
+            "properties": {
+                "number": {"type": "string", "description": "编号，如 1 或 1.1"},
+                "title": {"type": "string", "description": "标题"},
+                "words": {"type": "integer", "description": "预期字数"},
+                "children": {"type": "array", "items": {"$ref": "#/$defs/section"}}
+            },
+            "required": ["number", "title", "words", "children"]
+        }
+    }
+}
+
 class ReportGenerator:
-    def __init__(self, llm_backend: str = "openai", model_config: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        llm_backend: str = "openai",
+        model_config: Optional[Dict[str, Any]] = None,
+        progress_callback: Optional[Callable[[str], Awaitable[Any]]] = None
+    ):
         print(f"[DEBUG] Initializing ReportGenerator with backend: {llm_backend}")
+        # 延迟导入 langchain，仅在真正创建生成器时加载
+        from langchain.chains import LLMChain
+
         self.llm = create_llm(backend=llm_backend, model_config=model_config).get_model()
+        # 每个模板对应的链只构建一次，在整个报告生成过程中复用
+        self.chains: Dict[str, "LLMChain"] = {
+            name: LLMChain(llm=self.llm, prompt=PROMPTS.get(name))
+            for name in PROMPTS.names()
+        }
+        # 支持结构化输出（函数调用）的模型直接返回大纲 JSON，否则为 None
+        try:
+            self.structured_outline_chain = (
+                PROMPTS.get("outline_json") | self.llm.with_structured_output(OUTLINE_SCHEMA)
+            )
+        except (NotImplementedError, AttributeError, ValueError):
+            self.structured_outline_chain = None
         self.title = ""
         self.overview = ""
         self.total_words = 0
         self.outline_root = None  # 存储大纲树的根节点
+        # 提示中使用的大纲文本，在大纲确定时保存一次；之后挂到树上的子大纲不会进入提示
+        self.outline_text = ""
+        self.outline_simple_text = ""
         self.current_node = None  # 当前正在处理的节点
         self.summary = ""  # Add new field for summary
         self.sections_content = []  # 用于存储每个部分的内容
         self.current_part_content = []  # 存储当前部分已生成的内容
-        
-    
-    async def generate_content_dfs(self, node: OutlineNode) -> str:
+        self.progress_callback = progress_callback  # 进度通知回调，由界面层提供
+        self.max_retries = MAX_RETRIES  # 单个节点质量校验失败后的最大重试次数
+        self._retry_tasks: List[asyncio.Task] = []  # 正在后台重试的节点任务
+
+    async def _notify(self, message: str) -> None:
+        """向界面层发送进度信息"""
+        if self.progress_callback is not None:
+            await self.progress_callback(message)
+
+    async def _run_chain(self, name: str, **inputs: Any) -> str:
+        """在线程中运行同步链，避免阻塞事件循环"""
+        return await asyncio.to_thread(self.chains[name].run, **inputs)
+
+    def set_outline(self, root: OutlineNode) -> None:
+        """设置大纲，并保存提示中使用的一级大纲文本"""
+        self.outline_root = root
+        self.outline_text = root.to_text(include_words=True)
+        self.outline_simple_text = root.to_simple_text()
+
+    async def generate_all_content(self) -> str:
+        """生成全部正文：按深度优先生成，未通过质量校验的部分在后台并发重试"""
+        if not self.outline_text:
+            self.set_outline(self.outline_root)
+        self._retry_tasks = []
+        try:
+            await self.generate_content_dfs(self.outline_root)
+            if self._retry_tasks:
+                results = await asyncio.gather(*self._retry_tasks, return_exceptions=True)
+                for result in results:
+                    if isinstance(result, Exception):
+                        print(f"[ERROR] Retry task failed: {str(result)}")
+                # 重试可能替换了叶子节点内容，重新合并上层节点
+                self._merge_content(self.outline_root)
+        finally:
+            # 主流程中途失败时取消仍在运行的重试，避免继续消耗 token
+            pending = [task for task in self._retry_tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            self._retry_tasks = []
+        return self.outline_root.content
+
+    def _merge_content(self, node: OutlineNode) -> str:
+        if not node.is_leaf():
+            node.content = "\n\n".join(self._merge_content(child) for child in node.children)
+        return node.content
+
+    async def generate_content_dfs(self, node: OutlineNode, siblings: Optional[List[OutlineNode]] = None) -> str:
         """深度优先遍历生成内容"""
         # 如果有子节点，先生成所有子节点的内容
         if not node.is_leaf():
             all_content = []
             for child in node.children:
-                child_content = await self.generate_content_dfs(child)
+                child_content = await self.generate_content_dfs(child, node.children)
                 all_content.append(child_content)
             
             # 合并所有子节点的内容
@@ -170,148 +346,192 @@ class ReportGenerator:
         
         # 对于叶子节点，使用分段生成方法
         print(f"[DEBUG] Generating content for leaf node: {node.title}")
-        await cl.Message(content=f"正在生成：{node.title}...").send()
-        
-        content = await self.generate_section_content(node)
+        await self._notify(f"正在生成：{node.title}...")
         
-        node.content = content
-        return content
-    
+        return await self.generate_section_content(node, siblings)
+
+    async def _generate_checked_part(self, node: OutlineNode, siblings: List[OutlineNode]) -> str:
+        """生成单个部分并做质量校验，未通过时只重试该节点，重试与后续部分的生成并行进行"""
+        node.content = clean_section_content(await self._generate_single_part(node))
+        issues = self.check_node(node, siblings)
+        if issues:
+            print(f"[DEBUG] Quality gate failed for {node.title}: {issues}")
+            self._retry_tasks.append(asyncio.create_task(self._retry_node(node, siblings, issues)))
+        return node.content
+
+    def check_node(self, node: OutlineNode, siblings: List[OutlineNode], content: Optional[str] = None) -> List[str]:
+        """校验叶子节点内容：长度、截断、大纲标记以及与兄弟部分的重复"""
+        sibling_contents = [sibling.content for sibling in siblings if sibling is not node]
+        return check_section(node.content if content is None else content, node.words, sibling_contents)
+
+    async def _retry_node(self, node: OutlineNode, siblings: List[OutlineNode], issues: List[str]) -> None:
+        """有限次数地重新生成未通过校验的单个部分，保留问题最少的版本
+
+        只调用 single_part 重写该节点本身，不会重新生成子大纲或其他部分。
+        """
+        best_content, best_issues = node.content, issues
+        for attempt in range(1, self.max_retries + 1):
+            await self._notify(f"重新生成：{node.title}（第{attempt}次，原因：{'；'.join(best_issues)}）")
+            # 把上一版的问题和重复的兄弟部分写进提示，避免重试得到同样的结果
+            duplicate_titles = duplicated_siblings(best_content, {
+                sibling.title: sibling.content for sibling in siblings if sibling is not node
+            })
+            retry_hint = build_retry_hint(best_issues, duplicate_titles)
+            try:
+                candidate = clean_section_content(
+                    await self._generate_single_part(node, retry_hint=retry_hint)
+                )
+            except Exception as e:
+                # 重试失败时保留已有的最佳版本，不影响整份报告
+                print(f"[ERROR] Retry {attempt} failed for {node.title}: {str(e)}")
+                continue
+            candidate_issues = self.check_node(node, siblings, candidate)
+            if len(candidate_issues) < len(best_issues):
+                best_content, best_issues = candidate, candidate_issues
+                node.content = best_content
+            if not best_issues:
+                break
+        if best_issues:
+            print(f"[DEBUG] Keeping best attempt for {node.title} with issues: {best_issues}")
+
+    async def generate_outline(self) -> OutlineNode:
+        """生成大纲：优先使用结构化输出，其次解析 JSON 文本，再用正则解析同一回复
+
+        只有在已有回复都解析不出节点时才会再次调用模型。
+        """
+        inputs = {
+            "title": self.title,
+            "summary": self.summary,
+            "total_words": self.total_words
+        }
+        root = None
+
+        if self.structured_outline_chain is not None:
+            try:
+                data = await self.structured_outline_chain.ainvoke(inputs)
+                root = outline_from_dict(data, self.title)
+            except Exception as e:
+                print(f"[DEBUG] Structured outline failed: {str(e)}")
+
+        if root is None:
+            outline_text = await self._run_chain("outline_json", **inputs)
+            root = parse_outline_json(outline_text, self.title)
+            if root is None:
+                # 未按 JSON 输出的模型通常会返回 "1.1 标题 (N字)" 格式，先复用这次的回复
+                print("[DEBUG] Falling back to text outline parser")
+                root = parse_outline(outline_text, self.title)
+                if not root.children:
+                    root = None
+
+        if root is None:
+            # 两种解析都失败时才重新请求文本格式大纲
+            print("[DEBUG] Requesting text outline")
+            outline_text = await self._run_chain("outline", **inputs)
+            root = parse_outline(outline_text, self.title)
+
+        self.set_outline(normalize_outline_words(root, self.total_words))
+        return self.outline_root
+
+    async def generate_summary(self) -> str:
+        """生成报告摘要"""
+        self.summary = await self._run_chain("summary", title=self.title)
+        print(f"[DEBUG] Generated summary:\n{self.summary}")
+        return self.summary
+
     def count_chinese_chars(self, text: str) -> int:
         """统计中文字符数"""
         return len(re.findall(r'[\u4e00-\u9fff]', text))
 
-    def export_to_word(self) -> str:
-        """修改导出方法以支持树形结构"""
-        formatter = DocFormatter()
-        
-        # 添加标题
-        formatter.add_title(self.title)
-        
-        # 添加摘要
-        formatter.add_chapter("摘要")
-        formatter.add_content(self.summary)
-        
-        # 使用深度优先遍历添加正文内容
-        def add_node_content(node: OutlineNode):
-            # 如果不是叶子节点，
-            if node.level == 1 and node.number and node.title:
-                formatter.add_chapter(f"{node.number} {node.title}")
-            elif node.level == 2 and node.number and node.title:
-                formatter.add_section(f"{node.number} {node.title}")
-            elif node.level == 3 and node.number and node.title:
-                formatter.add_subsection(f"{node.number} {node.title}")
-            if node.is_leaf() and node.content:
-                formatter.add_content(node.content)
-            
-            for child in node.children:
-                add_node_content(child)
-        
-        # 从根节点开始添加内容
-        for node in self.outline_root.children:
-            add_node_content(node)
-        
-        # 生成文件名
+    def _render(self, formats: List[str]) -> Dict[str, BaseRenderer]:
+        """单次遍历大纲树，同时渲染所有格式；轻量格式在遍历中已流式写入磁盘"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"report_{timestamp}.docx"
-        
-        # 确保 output 目录存在
-        os.makedirs("output", exist_ok=True)
-        filepath = os.path.join("output", filename)
-        
-        # 保存文档
-        formatter.save(filepath)
-        return filepath,filename
+        renderers = create_renderers(formats, OUTPUT_DIR, f"report_{timestamp}")
+        render_report(self.title, self.summary, self.outline_root, renderers.values())
+        return renderers
+
+    async def export_report(
+        self, formats: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, Tuple[str, str]], Dict[str, "asyncio.Task"]]:
+        """导出报告
+
+        Returns:
+            (已完成的文件 {格式: (路径, 文件名)}, 后台构建中的文件 {格式: 任务})，
+            任务完成后同样返回 (路径, 文件名)。Markdown/HTML 立即可用，docx 在线程中构建。
+        """
+        renderers = self._render(formats or EXPORT_FORMATS)
+
+        def finish(renderer: BaseRenderer) -> Tuple[str, str]:
+            filepath = renderer.close()
+            return filepath, os.path.basename(filepath)
+
+        ready = {}
+        pending = {}
+        for fmt, renderer in renderers.items():
+            if renderer.deferred:
+                pending[fmt] = asyncio.create_task(asyncio.to_thread(finish, renderer))
+            else:
+                ready[fmt] = finish(renderer)
+        return ready, pending
+
+    def export_to_word(self) -> str:
+        """导出 Word 文档，返回 (路径, 文件名)"""
+        filepath = self._render(["docx"])["docx"].close()
+        return filepath, os.path.basename(filepath)
 
     async def generate_content_summary(self, content: str) -> str:
         """生成内容概要"""
-        summary_chain = LLMChain(
-            llm=self.llm,
-            prompt=PromptTemplate(
-                template=CONTENT_SUMMARY_TEMPLATE,
-                input_variables=["content"]
-            )
-        )
-        
-        return await cl.make_async(summary_chain.run)(
-            content=content
-        )
+        return await self._run_chain("content_summary", content=content)
     
-    async def generate_section_content(self, node: OutlineNode) -> str:
-        """分段生成章节内容，使用递归的方式处理大段落"""
-        total_words = node.words
-        
-        if total_words <= PART_LENGTH:
+    async def generate_section_content(self, node: OutlineNode, siblings: Optional[List[OutlineNode]] = None) -> str:
+        """分段生成章节内容，大段落先生成子大纲再逐个生成子部分
+
+        每个实际调用模型生成的部分（短章节本身或长章节的各子部分）都单独做质量校验，
+        未通过的部分在后台重试，由 generate_all_content 统一等待。
+
+        Args:
+            node: 要生成的节点
+            siblings: node 的兄弟节点，用于重复检测
+        """
+        if node.words <= PART_LENGTH:
             # 如果字数在限制范围内，直接生成内容
-            return await self._generate_single_part(node)
+            return await self._generate_checked_part(node, siblings or [])
         
-        # 为大段落生成子大纲
+        # 为大段落生成子大纲，并作为子节点挂到当前节点下，导出时保留各子部分标题
         subsection_outline = await self._generate_subsection_outline({
             "title": node.title,
             "words": node.words
         })
-        
-        # 存储所有生成的内容
-        all_content = []
-        
-        # 遍历大纲树生成内容
-        async def traverse_outline(node: OutlineNode) -> str:
-            if node.is_leaf():  # 如果是叶子节点
-                return await self._generate_single_part(node)
+        normalize_outline_words(subsection_outline, node.words)
+        attach_subsections(node, subsection_outline.children)
+        if node.is_leaf():
+            # 子大纲为空时整体生成
+            return await self._generate_checked_part(node, siblings or [])
+        
+        # 遍历子大纲生成内容，每个子部分的内容保存在各自节点上，并与同级子部分比较
+        async def traverse_outline(current: OutlineNode, current_siblings: List[OutlineNode]) -> str:
+            if current.is_leaf():  # 如果是叶子节点
+                return await self._generate_checked_part(current, current_siblings)
             
             all_content = []
-            for child in node.children:
-                content = await traverse_outline(child)
+            for child in current.children:
+                content = await traverse_outline(child, current.children)
                 all_content.append(content)
                 
                 # 显示生成进度
                 actual_words = self.count_chinese_chars(content)
-                await cl.Message(
-                    content=f"完成子部分：{child.title}\n字数：{actual_words}").send()
+                await self._notify(f"完成子部分：{child.title}\n字数：{actual_words}")
             
-            return "\n".join(all_content)
+            current.content = "\n\n".join(all_content)
+            return current.content
 
-        # 从根节点开始遍历
-        all_content = await traverse_outline(subsection_outline)
-        
-        return "\n".join(all_content)
+        return await traverse_outline(node, siblings or [])
 
     async def _generate_subsection_outline(self, section: Dict[str, Any]) -> OutlineNode:
         """生成子部分大纲"""
-
-        SUBSECTION_OUTLINE_TEMPLATE = """
-请为当前部分生成详细的子大纲，并为每个子部分标注预期字数：
-
-主题：{title}
-全局大纲概述：
-{full_outline}
-当前部分标题：{section_title}
-总字数要求：{target_words}字
-
-要求：
-1. 仅根据当前部分{section_title}生成子部分大纲，确保与全局大纲保持一致，但不直接引用全局大纲内容。
-2. 将当前部分{section_title}的内容分成多个子部分，每个子部分不超过{max_length}字。
-3. 子部分之间要有逻辑连贯性和自然过渡。
-4. 按以下格式输出：
-    1. 子部分标题 (字数)
-    2. 子部分标题 (字数)
-    ...
-5. 请勿输出其他部分的大纲或与当前部分无关的信息。
-
-现在，请开始生成 {section_title} 的子部分大纲：
-"""
-
-        outline_chain = LLMChain(
-            llm=self.llm,
-            prompt=PromptTemplate(
-                template=SUBSECTION_OUTLINE_TEMPLATE,
-                input_variables=["title", "section_title", "target_words", "max_length"]
-            )
-        )
-        
-        outline_text = await cl.make_async(outline_chain.run)(
+        outline_text = await self._run_chain(
+            "subsection_outline",
             title=self.title,
-            full_outline=self.outline_root.to_simple_text(),
+            full_outline=self.outline_simple_text,
             section_title=section["title"],
             target_words=section["words"],
             max_length=PART_LENGTH
@@ -319,171 +539,25 @@ class ReportGenerator:
         
         return parse_outline(outline_text, section["title"])
 
-    async def _generate_single_part(self, node: OutlineNode, subsection_outline: OutlineNode = None) -> str:
+    async def _generate_single_part(
+        self, node: OutlineNode, subsection_outline: OutlineNode = None, retry_hint: str = ""
+    ) -> str:
         """生成单个部分的内容"""
-        SINGLE_PART_TEMPLATE = """
-        请基于以下信息生成内容：
-        
-        报告主题：{title}
-        报告概述：{overview}
-        当前部分：{section_title}
-        目标字数：{target_words}字
-        当前层级：{level}级标题
-        
-        全文大纲：
-        {full_outline}
-        
-        {section_outline}
-        
-        要求：
-        1. 内容要详实、专业、有深度
-        2. 控制在目标字数范围内
-        3. 行文流畅自然，注意与整体结构的连贯性
-        4. 如果提供了当前节大纲，需要严格按照大纲展开
-        
-        请直接生成内容：
-        """
-        
-        section_chain = LLMChain(
-            llm=self.llm,
-            prompt=PromptTemplate(
-                template=SINGLE_PART_TEMPLATE,
-                input_variables=[
-                    "title", "overview", "section_title", 
-                    "target_words", "level", "full_outline", "section_outline"
-                ]
-            )
-        )
-        
-        # 将完整大纲转换为文本形式
-        full_outline = self.outline_root.to_text(include_words=True)
-        
         # 如果节点有子节点，生成当前节的子大纲
         section_outline_text = ""
         if subsection_outline:
             section_outline_text = "当前节大纲：\n" + subsection_outline.to_text(include_words=True)
         
-        content = await cl.make_async(section_chain.run)(
+        content = await self._run_chain(
+            "single_part",
             title=self.title,
             overview=self.overview,
             section_title=node.title,
             target_words=node.words,
             level=node.level,
-            full_outline=full_outline,
-            section_outline=section_outline_text
+            full_outline=self.outline_text,
+            section_outline=section_outline_text,
+            retry_hint=retry_hint
         )
         
         return content
-
-@cl.on_chat_start
-async def start():
-    model_config = {
-        "temperature": 0.7,
-        # 其他配置参数...
-    }
-    
-    generator = ReportGenerator(
-        llm_backend="openai",  # 或 "ollama"
-        model_config=model_config
-    )
-    cl.user_session.set("generator", generator)
-    
-    # 发送欢迎消息
-    await cl.Message(
-        content="你好！我是AI写作助手。请按以下格式输入报告需求：\n"
-                "主题：你的报告主题\n"
-                "字数：期望的总字数\n"
-                "#例如：#\n"
-                "主题：张家界实景三维大屏展示系统项目建设方案\n"
-                "字数：30000\n"
-                
-                ).send()
-
-@cl.on_message
-async def main(message: cl.Message):
-    generator = cl.user_session.get("generator")
-    print(f"[DEBUG] Received message: {message.content}")
-    
-    if not generator.title:
-        try:
-            lines = message.content.split('\n')
-            for line in lines:
-                if line.startswith('主题：'):
-                    generator.title = line.replace('主题：', '').strip()
-                elif line.startswith('概述：'):
-                    generator.overview = line.replace('概述：', '').strip()
-                elif line.startswith('字数：'):
-                    generator.total_words = int(line.replace('字数：', '').strip())
-            
-            # Generate summary
-            await cl.Message(content="正在生成摘要...").send()
-            
-            summary_chain = LLMChain(
-                llm=generator.llm,
-                prompt=PromptTemplate(
-                    template=SUMMARY_TEMPLATE,
-                    input_variables=["title"]
-                )
-            )
-            
-            generator.summary = await cl.make_async(summary_chain.run)(
-                title=generator.title
-            )
-            print(f"[DEBUG] Generated summary:\n{generator.summary}")
-            
-            # Generate outline
-            await cl.Message(content="正在生成大纲...").send()
-            
-            outline_chain = LLMChain(
-                llm=generator.llm,
-                prompt=PromptTemplate(
-                    template=OUTLINE_TEMPLATE,
-                    input_variables=["title", "summary", "total_words"]
-                )
-            )
-            
-            outline_result = await cl.make_async(outline_chain.run)(
-                title=generator.title,
-                summary=generator.summary,
-                total_words=generator.total_words
-            )
-            
-            generator.outline_root = parse_outline(outline_result, generator.title)
-            
-            await cl.Message(
-                content=f"已生成摘要和大纲：\n\n"
-                        f"摘要：\n{generator.summary}\n\n"
-                        f"大纲：\n{outline_result}\n\n"
-                        f"请输入：\n"
-                        f"1. '继续生成' - 开始生成正文\n"
-                        f"2. '重新生成' - 重新生成大纲").send()
-            
-        except Exception as e:
-            print(f"[ERROR] Error processing input: {str(e)}")
-            await cl.Message(content=f"输入格式有误，请重新输入。错误信息：{str(e)}").send()
-            
-    elif message.content in ["继续生成", "重新生成"]:
-        if message.content == "继续生成":
-            try:
-                # 使用深度优先遍历生成所有内容
-                await generator.generate_content_dfs(generator.outline_root)
-                
-                # 导出文档
-                filepath,filename = generator.export_to_word()
-                elements = [
-                    cl.File(
-                        name=filename,  # 使用生成的文件名
-                        path=filepath,  # 文件的本地路径
-                        display="inline",
-                    ),
-                ]
-                
-                await cl.Message(
-                    content="报告生成完成！已导出到文件：", elements=elements
-                ).send()
-                
-                # 下载文件到 本地
-                
-            except Exception as e:
-                print(f"[ERROR] Failed to generate content: {str(e)}")
-                await cl.Message(content=f"生成内容时发生错误：{str(e)}").send() 
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""测试用的假模型：用按模板名应答的假链替换 ReportGenerator.chains，不发起任何请求"""
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from report_generator import ReportGenerator, OutlineNode
+
+PARAGRAPH = "数字孪生技术通过构建物理实体的虚拟映射，实现对水务系统运行状态的实时感知与预测分析。"
+
+
+class FakeChain:
+    """与 LLMChain.run 接口一致，把调用记录到共享列表后交给 respond 生成回复"""
+
+    def __init__(self, name: str, respond: Callable[[str, Dict[str, Any]], str],
+                 calls: List[Tuple[str, Dict[str, Any]]], lock: threading.Lock):
+        self.name = name
+        self.respond = respond
+        self.calls = calls
+        self.lock = lock
+
+    def run(self, **inputs: Any) -> str:
+        with self.lock:
+            self.calls.append((self.name, inputs))
+        return self.respond(self.name, inputs)
+
+
+def make_generator(respond: Callable[[str, Dict[str, Any]], str],
+                   structured_outline_chain: Optional[Any] = None) -> Tuple[ReportGenerator, list]:
+    """创建生成器并替换全部链，返回 (生成器, 调用记录)
+
+    调用记录为 [(模板名, 输入参数), ...]。使用 ollama 后端，构造时不会连接模型。
+    """
+    generator = ReportGenerator(llm_backend="ollama")
+    generator.title = "测试报告"
+    calls: List[Tuple[str, Dict[str, Any]]] = []
+    lock = threading.Lock()
+    generator.chains = {name: FakeChain(name, respond, calls, lock) for name in generator.chains}
+    generator.structured_outline_chain = structured_outline_chain
+    return generator, calls
+
+
+def make_outline(*sections: Tuple[str, int]) -> OutlineNode:
+    """按 (标题, 字数) 创建只有一级部分的大纲"""
+    root = OutlineNode("测试报告", 0)
+    for index, (title, words) in enumerate(sections, start=1):
+        root.add_child(OutlineNode(title, words, str(index)))
+    return root
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import unittest
+from fake_llm import PARAGRAPH, make_generator, make_outline
+
+
+def single_part_calls(calls, title):
+    return [inputs for name, inputs in calls if name == "single_part" and inputs["section_title"] == title]
+
+
+class TestContentRetry(unittest.TestCase):
+
+    def test_failed_retry_keeps_first_draft(self):
+        def respond(name, inputs):
+            if inputs["section_title"] == "背景":
+                if inputs["retry_hint"]:
+                    raise RuntimeError("transient API error")
+                return PARAGRAPH[:10]  # 字数不足，触发重试
+            return inputs["section_title"] + PARAGRAPH
+
+        generator, calls = make_generator(respond)
+        generator.outline_root = make_outline(("背景", 40), ("目标", 40))
+        asyncio.run(generator.generate_all_content())
+
+        self.assertEqual(generator.outline_root.children[0].content, PARAGRAPH[:10])
+        self.assertEqual(len(single_part_calls(calls, "背景")), 1 + generator.max_retries)
+
+    def test_retry_tasks_cancelled_on_failure(self):
+        release = threading.Event()
+
+        def respond(name, inputs):
+            if inputs["section_title"] == "目标":
+                raise RuntimeError("transient API error")
+            if inputs["retry_hint"]:
+                release.wait(5)
+            return PARAGRAPH[:10]
+
+        generator, calls = make_generator(respond)
+        generator.outline_root = make_outline(("背景", 40), ("目标", 40))
+
+        async def scenario():
+            with self.assertRaises(RuntimeError):
+                await generator.generate_all_content()
+            attempts = len(single_part_calls(calls, "背景"))
+            release.set()
+            await asyncio.sleep(0.2)
+            # 取消后不会再发起新的重试
+            self.assertEqual(len(single_part_calls(calls, "背景")), attempts)
+            self.assertEqual(generator.outline_root.children[0].content, PARAGRAPH[:10])
+
+        asyncio.run(scenario())
+
+    def test_retry_prompt_describes_issues(self):
+        def respond(name, inputs):
+            if inputs["retry_hint"]:
+                return "目标部分改写后的内容，从实施路径与验收标准两个角度展开说明。"
+            return PARAGRAPH  # 两个部分内容相同，第二个部分触发重复检查
+
+        generator, calls = make_generator(respond)
+        generator.outline_root = make_outline(("背景", 40), ("目标", 40))
+        asyncio.run(generator.generate_all_content())
+
+        hints = [inputs["retry_hint"] for name, inputs in calls if inputs.get("retry_hint")]
+        self.assertEqual(len(hints), 1)
+        self.assertIn("与相邻部分内容重复", hints[0])
+        self.assertIn("“背景”", hints[0])
+        self.assertTrue(generator.outline_root.children[1].content.startswith("目标部分改写后"))
+
+    def test_only_failing_sub_part_retried(self):
+        offsets = {"甲": 0, "乙": 1000, "丙": 2000}
+
+        def part(title):
+            # 各子部分使用互不重复的汉字，避免触发重复检查
+            return title + "".join(chr(0x4e00 + offsets[title] + i) for i in range(399)) + "。"
+
+        def respond(name, inputs):
+            if name == "subsection_outline":
+                return "1. 甲 (400字)\n2. 乙 (400字)\n3. 丙 (400字)"
+            title = inputs["section_title"]
+            if title == "甲" and not inputs["retry_hint"]:
+                # 第一个子部分在句中中断，长度仍然正常
+                return part(title)[:-1]
+            return part(title)
+
+        generator, calls = make_generator(respond)
+        generator.outline_root = make_outline(("平台", 1200))
+        asyncio.run(generator.generate_all_content())
+
+        section = generator.outline_root.children[0]
+        self.assertEqual([node.number for node in section.children], ["1.1", "1.2", "1.3"])
+        self.assertTrue(section.children[0].content.endswith("。"))
+        self.assertIn(section.children[0].content, section.content)
+        # 只重写了“甲”，子大纲和其他子部分都没有重新生成
+        self.assertEqual([name for name, inputs in calls].count("subsection_outline"), 1)
+        self.assertEqual(len(single_part_calls(calls, "甲")), 2)
+        self.assertIn("内容被截断", single_part_calls(calls, "甲")[1]["retry_hint"])
+        self.assertEqual(len(single_part_calls(calls, "乙")), 1)
+        self.assertEqual(len(single_part_calls(calls, "丙")), 1)
+
+if __name__ == '__main__':
+    unittest.main()
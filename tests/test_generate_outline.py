@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+from fake_llm import make_generator
+
+
+JSON_OUTLINE = '{"sections": [{"title": "引言", "words": 1000}, {"title": "方案", "words": 2000}]}'
+
+
+class FakeStructuredChain:
+    """替代结构化输出链：返回预设结果或抛出异常，并记录调用次数"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    async def ainvoke(self, inputs):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def make_outline_generator(replies, structured_outline_chain=None):
+    """按模板名返回预设回复，返回 (生成器, 调用的模板名列表)"""
+    generator, calls = make_generator(lambda name, inputs: replies[name], structured_outline_chain)
+    generator.total_words = 3000
+    return generator, calls
+
+
+def called_templates(calls):
+    return [name for name, inputs in calls]
+
+
+class TestGenerateOutline(unittest.TestCase):
+
+    def test_json_reply(self):
+        generator, calls = make_outline_generator({
+            "outline_json": '{"sections": [{"title": "引言", "words": 1000}, {"title": "方案", "words": 2000}]}'
+        })
+        root = asyncio.run(generator.generate_outline())
+        self.assertEqual([node.title for node in root.children], ["引言", "方案"])
+        self.assertEqual(called_templates(calls), ["outline_json"])
+
+    def test_text_reply_reparsed_without_new_call(self):
+        generator, calls = make_outline_generator({
+            "outline_json": "1. 引言 (1000字)\n2. 方案 (2000字)\n    2.1 架构 (2000字)"
+        })
+        root = asyncio.run(generator.generate_outline())
+        self.assertEqual([node.number for node in root.iter_nodes()], ["1", "2", "2.1"])
+        self.assertEqual(called_templates(calls), ["outline_json"])
+
+    def test_legacy_prompt_only_when_both_parsers_fail(self):
+        generator, calls = make_outline_generator({
+            "outline_json": "抱歉，我无法生成大纲。",
+            "outline": "1. 引言 (3000字)"
+        })
+        root = asyncio.run(generator.generate_outline())
+        self.assertEqual(root.children[0].title, "引言")
+        self.assertEqual(called_templates(calls), ["outline_json", "outline"])
+
+    def test_structured_output(self):
+        structured = FakeStructuredChain({"sections": [
+            {"number": "1", "title": "引言", "words": 1000, "children": []},
+            {"number": "2", "title": "方案", "words": 2000, "children": []}
+        ]})
+        generator, calls = make_outline_generator({}, structured)
+        root = asyncio.run(generator.generate_outline())
+        self.assertEqual([node.title for node in root.children], ["引言", "方案"])
+        self.assertEqual(structured.calls, 1)
+        # 结构化输出成功时不会发起任何文本请求
+        self.assertEqual(called_templates(calls), [])
+
+    def test_structured_output_returns_none(self):
+        structured = FakeStructuredChain(None)
+        generator, calls = make_outline_generator({"outline_json": JSON_OUTLINE}, structured)
+        root = asyncio.run(generator.generate_outline())
+        self.assertEqual([node.title for node in root.children], ["引言", "方案"])
+        self.assertEqual(called_templates(calls), ["outline_json"])
+
+    def test_structured_output_raises(self):
+        structured = FakeStructuredChain(RuntimeError("tool call failed"))
+        generator, calls = make_outline_generator({"outline_json": JSON_OUTLINE}, structured)
+        root = asyncio.run(generator.generate_outline())
+        self.assertEqual(len(root.children), 2)
+        self.assertEqual(structured.calls, 1)
+        self.assertEqual(called_templates(calls), ["outline_json"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入核心模块时不应加载的重量级依赖
+HEAVY_MODULES = [
+    "chainlit",
+    "langchain",
+    "langchain_core",
+    "langchain_openai",
+    "langchain_community",
+    "docx",
+    "dotenv",
+]
+
+# report_generator 累计导入耗时上限（微秒），预留充足余量以避免机器差异导致误报
+IMPORT_BUDGET_US = 500_000
+
+
+def run_python(code: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_core_modules_do_not_load_heavy_dependencies(self):
+        for module in ["report_generator", "llm_wrapper", "prompt_templates"]:
+            result = run_python(
+                f"import sys, {module}\n"
+                f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+            )
+            self.assertEqual(result.stdout.strip(), "", f"{module} loaded: {result.stdout.strip()}")
+
+    def test_report_generator_import_time(self):
+        result = run_python("import report_generator", "-X", "importtime")
+        match = re.search(r'^import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*report_generator$',
+                          result.stderr, re.M)
+        self.assertIsNotNone(match)
+        self.assertLess(int(match.group(1)), IMPORT_BUDGET_US)
+
+if __name__ == '__main__':
+    unittest.main()
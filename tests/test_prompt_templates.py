@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from prompt_templates import PROMPT_DIR, PROMPT_OVERRIDE_ENV, PromptRegistry, _search_dirs
+
+
+def write_template(directory: str, filename: str, text: str) -> None:
+    with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+class TestPromptRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.base_dir = os.path.join(self._tmp.name, "base")
+        self.override_dir = os.path.join(self._tmp.name, "override")
+        os.makedirs(self.base_dir)
+        os.makedirs(self.override_dir)
+        write_template(self.base_dir, "outline.v1.txt", "内置大纲：{title}")
+        write_template(self.base_dir, "outline.v2.txt", "新版大纲：{title}，{total_words}字")
+        write_template(self.base_dir, "summary.v1.txt", "内置摘要：{title}")
+        self.versions = {"outline": "v1", "summary": "v1"}
+
+    def test_override_dir_takes_precedence(self):
+        write_template(self.override_dir, "outline.v1.txt", "覆盖大纲：{title}")
+        registry = PromptRegistry(self.versions, [self.override_dir, self.base_dir])
+        self.assertEqual(registry.text("outline"), "覆盖大纲：{title}")
+        # 覆盖目录中没有的模板仍使用内置文件
+        self.assertEqual(registry.text("summary"), "内置摘要：{title}")
+        self.assertEqual(registry.get("outline").format(title="测试"), "覆盖大纲：测试")
+
+    def test_override_dir_from_environment(self):
+        with mock.patch.dict(os.environ, {PROMPT_OVERRIDE_ENV: self.override_dir}):
+            self.assertEqual(_search_dirs(), [self.override_dir, PROMPT_DIR])
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(_search_dirs(), [PROMPT_DIR])
+
+    def test_get_non_current_version(self):
+        registry = PromptRegistry(self.versions, [self.base_dir])
+        self.assertEqual(registry.get("outline").template, "内置大纲：{title}")
+        legacy = registry.get("outline", "v2")
+        self.assertEqual(legacy.format(title="测试", total_words=3000), "新版大纲：测试，3000字")
+        self.assertEqual(sorted(legacy.input_variables), ["title", "total_words"])
+
+    def test_cache_key_and_reuse(self):
+        registry = PromptRegistry(self.versions, [self.base_dir])
+        self.assertEqual(PromptRegistry.key("outline", "v1"), "outline@v1")
+        template = registry.get("outline")
+        # 文件在首次读取后修改不影响已缓存的模板
+        write_template(self.base_dir, "outline.v1.txt", "修改后：{title}")
+        self.assertIs(registry.get("outline"), template)
+        self.assertIs(registry.get("outline", "v1"), template)
+        self.assertEqual(registry.text("outline"), "内置大纲：{title}")
+
+    def test_missing_template_file(self):
+        with self.assertRaises(FileNotFoundError):
+            PromptRegistry({"outline": "v9"}, [self.base_dir])
+        registry = PromptRegistry(self.versions, [self.base_dir])
+        with self.assertRaises(FileNotFoundError):
+            registry.get("outline", "v9")
+
+    def test_unknown_template_name(self):
+        registry = PromptRegistry(self.versions, [self.base_dir])
+        with self.assertRaises(KeyError):
+            registry.get("missing")
+        with self.assertRaises(KeyError):
+            registry.text("missing")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from quality_gate import (
+    build_retry_hint, check_section, clean_section_content, count_words,
+    duplicated_siblings, duplication_ratio, is_truncated
+)
+
+PARAGRAPH = "数字孪生技术通过构建物理实体的虚拟映射，实现对水务系统运行状态的实时感知与预测分析。"
+
+
+class TestQualityGate(unittest.TestCase):
+
+    def test_clean_section_content(self):
+        content = "## 1.1 项目背景\n\n" + PARAGRAPH + "\n# 小结\n" + PARAGRAPH
+        self.assertEqual(clean_section_content(content), PARAGRAPH + "\n" + PARAGRAPH)
+
+    def test_count_words(self):
+        self.assertEqual(count_words("数字孪生 digital twin"), 6)
+
+    def test_passes_good_content(self):
+        content = PARAGRAPH * 3
+        self.assertEqual(check_section(content, count_words(content)), [])
+
+    def test_empty_content(self):
+        self.assertEqual(check_section("  \n", 1000), ["内容为空"])
+
+    def test_truncated_content(self):
+        content = PARAGRAPH + "\n" + PARAGRAPH[:-1] + "同时为管理部门提供决策"
+        self.assertTrue(is_truncated(content))
+        self.assertIn("内容被截断", check_section(content, count_words(content)))
+        # 短的列表项结尾不视为截断
+        self.assertFalse(is_truncated(PARAGRAPH + "\n- 数据采集层"))
+
+    def test_repeated_outline(self):
+        content = "1. 引言 (2000字)\n1.1 项目背景 (1000字)\n1.2 研究目的（1000字）"
+        self.assertIn("输出了大纲而非正文", check_section(content, 1000))
+
+    def test_leaked_outline_markers(self):
+        content = PARAGRAPH * 2 + "\n2.1 技术架构 (1000字)\n" + PARAGRAPH * 2
+        self.assertIn("混入1行大纲标记", check_section(content, count_words(content)))
+
+    def test_length_deviation(self):
+        issues = check_section(PARAGRAPH, 1000)
+        self.assertEqual(len(issues), 1)
+        self.assertTrue(issues[0].startswith("字数偏差过大"))
+
+    def test_duplicate_with_sibling(self):
+        content = PARAGRAPH * 3
+        self.assertGreater(duplication_ratio(content, PARAGRAPH), 0.3)
+        self.assertIn("与相邻部分内容重复", check_section(content, count_words(content), [PARAGRAPH]))
+        self.assertEqual(duplication_ratio(content, "完全不同的另一段关于经济效益分析的文字。"), 0.0)
+
+    def test_duplicated_siblings(self):
+        siblings = {"背景": PARAGRAPH, "目标": "完全不同的另一段关于经济效益分析的文字。", "空": ""}
+        self.assertEqual(duplicated_siblings(PARAGRAPH * 3, siblings), ["背景"])
+
+    def test_build_retry_hint(self):
+        self.assertEqual(build_retry_hint([]), "")
+        hint = build_retry_hint(["内容被截断", "与相邻部分内容重复"], ["背景"])
+        self.assertIn("- 内容被截断。请完整写完每一句话", hint)
+        self.assertIn("请避免与“背景”重复", hint)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from report_generator import OutlineNode
+from renderers import create_renderers, render_report
+
+
+def build_outline() -> OutlineNode:
+    root = OutlineNode("报告", 0)
+    chapter = OutlineNode("技术架构", 2000, "1")
+    section = OutlineNode("数据层", 1000, "1.1")
+    subsection = OutlineNode("数据采集", 500, "1.1.1")
+    deep = OutlineNode("传感器<接入>", 500, "1.1.1.1")
+    for node, level in [(chapter, 1), (section, 2), (subsection, 3), (deep, 4)]:
+        node.level = level
+    deep.content = "## 多余标题\n传感器数据实时接入平台。\n\n数据经过清洗后入库。"
+    subsection.add_child(deep)
+    section.add_child(subsection)
+    chapter.add_child(section)
+    root.add_child(chapter)
+    return root
+
+
+class TestRenderers(unittest.TestCase):
+
+    def test_iter_nodes_preorder(self):
+        root = build_outline()
+        self.assertEqual([node.number for node in root.iter_nodes()],
+                         ["1", "1.1", "1.1.1", "1.1.1.1"])
+
+    def test_markdown_and_html_from_one_pass(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            renderers = create_renderers(["md", "html"], output_dir, "report")
+            render_report("测试报告", "摘要内容。", build_outline(), renderers.values())
+            paths = {fmt: renderer.close() for fmt, renderer in renderers.items()}
+
+            with open(paths["md"], encoding="utf-8") as f:
+                markdown = f.read()
+            self.assertTrue(markdown.startswith("# 测试报告\n"))
+            self.assertIn("## 摘要\n\n摘要内容。", markdown)
+            # 四级节点同样保留标题
+            self.assertIn("##### 1.1.1.1 传感器<接入>", markdown)
+            self.assertIn("传感器数据实时接入平台。\n\n数据经过清洗后入库。", markdown)
+            self.assertNotIn("多余标题", markdown)
+
+            with open(paths["html"], encoding="utf-8") as f:
+                page = f.read()
+            self.assertIn("<h1>测试报告</h1>", page)
+            self.assertIn("<h5>1.1.1.1 传感器&lt;接入&gt;</h5>", page)
+            self.assertIn("<p>数据经过清洗后入库。</p>", page)
+            self.assertTrue(page.rstrip().endswith("</html>"))
+
+    def test_unsupported_format(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            with self.assertRaises(ValueError):
+                create_renderers(["pdf"], output_dir, "report")
+
+    def test_docx_is_deferred(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            renderer = create_renderers(["docx"], output_dir, "report")["docx"]
+            self.assertTrue(renderer.deferred)
+            render_report("测试报告", "摘要内容。", build_outline(), [renderer])
+            # 遍历阶段只记录操作，不写文件
+            self.assertFalse(os.path.exists(renderer.filepath))
+
+    def test_files_closed_when_walk_fails(self):
+        class BrokenOutline:
+            def iter_nodes(self):
+                yield from build_outline().iter_nodes()
+                raise RuntimeError("walk failed")
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            renderers = create_renderers(["md", "html"], output_dir, "report")
+            with self.assertRaises(RuntimeError):
+                render_report("测试报告", "摘要内容。", BrokenOutline(), renderers.values())
+            # 未写完的文件已关闭并删除
+            self.assertEqual(os.listdir(output_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
-from report_generator import parse_outline, OutlineNode
+from report_generator import (
+    parse_outline, parse_outline_json, normalize_outline_words, OutlineNode
+)
 
 class TestReportGenerator(unittest.TestCase):
     
@@ -125,5 +127,67 @@ class TestReportGenerator(unittest.TestCase):
         total_words = sum(section.words for section in root.children)
         self.assertEqual(total_words, 37000)
 
+    def test_parse_outline_full_width_parentheses(self):
+        outline_text = """
+## 1. 引言（2000字）
+   1.1 背景与意义（1000 字）
+   1.2 研究目的与方法 (1000字)
+"""
+        root = parse_outline(outline_text, "报告")
+        self.assertEqual(len(root.children), 1)
+        self.assertEqual(root.children[0].words, 2000)
+        self.assertEqual(len(root.children[0].children), 2)
+
+    def test_parse_outline_json(self):
+        outline_text = """```json
+{"sections": [
+    {"number": "1", "title": "引言", "words": 2000, "children": [
+        {"number": "1.1", "title": "项目背景", "words": "1000字", "children": []},
+        {"title": "研究目的", "words": 1000}
+    ]},
+    {"number": "2", "title": "项目概述", "words": 3000, "children": []}
+]}
+```"""
+        root = parse_outline_json(outline_text, "报告")
+        self.assertEqual(len(root.children), 2)
+
+        first_section = root.children[0]
+        self.assertEqual(first_section.title, "引言")
+        self.assertEqual(first_section.level, 1)
+        self.assertEqual(first_section.children[0].words, 1000)
+        # 缺失的编号按位置补全
+        self.assertEqual(first_section.children[1].number, "1.2")
+        self.assertEqual(first_section.children[1].level, 2)
+
+    def test_parse_outline_json_with_surrounding_notes(self):
+        outline_text = (
+            "以下为大纲[JSON]：\n"
+            '{"sections": [{"title": "引言", "words": 1000}, {"title": "方案", "words": 2000}]}\n'
+            "（注：子部分为[可选]内容，{字数}可调整）"
+        )
+        root = parse_outline_json(outline_text, "报告")
+        self.assertEqual([node.title for node in root.children], ["引言", "方案"])
+
+    def test_parse_outline_json_invalid(self):
+        self.assertIsNone(parse_outline_json("1. 引言 (3000字)", "报告"))
+        self.assertIsNone(parse_outline_json('{"sections": []}', "报告"))
+
+    def test_normalize_outline_words(self):
+        root = OutlineNode("报告", 0)
+        first = OutlineNode("引言", 1000, "1")
+        second = OutlineNode("概述", 0, "2")
+        first.add_child(OutlineNode("背景", 300, "1.1"))
+        first.add_child(OutlineNode("意义", 300, "1.2"))
+        root.add_child(first)
+        root.add_child(second)
+
+        normalize_outline_words(root, 4000)
+
+        self.assertEqual(root.words, 4000)
+        # 缺失字数的部分分得剩余预算
+        self.assertEqual(second.words, 3000)
+        # 子部分之和偏离父节点时按比例缩放
+        self.assertEqual(sum(child.words for child in first.children), 1000)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
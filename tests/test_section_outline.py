@@ -0,0 +1,64 @@
+import asyncio
+import tempfile
+import unittest
+from fake_llm import PARAGRAPH, make_generator
+from report_generator import OutlineNode, PART_LENGTH
+from renderers import create_renderers, render_report
+
+SUBSECTION_OUTLINE = "1. 数据采集 (1000字)\n2. 数据治理 (1000字)\n    2.1 数据清洗 (500字)\n    2.2 数据入库 (500字)"
+
+
+def respond(name, inputs):
+    if name == "subsection_outline":
+        return SUBSECTION_OUTLINE
+    title = inputs["section_title"]
+    return f"## {title}\n{title}：{PARAGRAPH}"
+
+
+class TestSectionOutline(unittest.TestCase):
+
+    def setUp(self):
+        self.generator, self.calls = make_generator(respond)
+        root = OutlineNode("测试报告", 0)
+        chapter = OutlineNode("技术架构", PART_LENGTH * 2, "2")
+        self.section = OutlineNode("数据层", PART_LENGTH * 2, "2.1")
+        self.section.level = 2
+        chapter.add_child(self.section)
+        root.add_child(chapter)
+        self.generator.set_outline(root)
+
+    def test_subsections_attached_to_node(self):
+        content = asyncio.run(self.generator.generate_section_content(self.section))
+
+        self.assertEqual([(node.number, node.level) for node in self.section.iter_nodes()],
+                         [("2.1.1", 3), ("2.1.2", 3), ("2.1.2.1", 4), ("2.1.2.2", 4)])
+        leaf = self.section.children[1].children[0]
+        self.assertEqual(leaf.content, f"数据清洗：{PARAGRAPH}")
+        self.assertIn(leaf.content, content)
+        self.assertNotIn("##", content)
+
+    def test_subsection_headings_rendered(self):
+        asyncio.run(self.generator.generate_section_content(self.section))
+        with tempfile.TemporaryDirectory() as output_dir:
+            renderer = create_renderers(["md"], output_dir, "report")["md"]
+            render_report("测试报告", "", self.generator.outline_root, [renderer])
+            with open(renderer.close(), encoding="utf-8") as f:
+                markdown = f.read()
+        self.assertIn("#### 2.1.1 数据采集\n\n数据采集：", markdown)
+        self.assertIn("##### 2.1.2.1 数据清洗\n\n数据清洗：", markdown)
+
+    def test_prompts_use_top_level_outline(self):
+        second = OutlineNode("应用层", 500, "2.2")
+        second.level = 2
+        self.generator.outline_root.children[0].add_child(second)
+        self.generator.set_outline(self.generator.outline_root)
+        asyncio.run(self.generator.generate_all_content())
+
+        # 已挂到树上的子大纲不会进入后续提示
+        prompt_outlines = [inputs["full_outline"] for name, inputs in self.calls if name == "single_part"]
+        self.assertTrue(all(outline == prompt_outlines[0] for outline in prompt_outlines))
+        self.assertNotIn("数据采集", prompt_outlines[-1])
+        self.assertIn("2.2 应用层", prompt_outlines[-1])
+
+if __name__ == '__main__':
+    unittest.main()